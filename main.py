@@ -12,17 +12,137 @@ Description:
     - Lookup county and county seat by license plate prefix.
     - Lookup license plate prefix by city name.
     - Persistently store new city entries for future use.
+    - Batch lookups from piped or redirected input.
     - Basic input validation and error handling.
 
 Requirements:
     Python 3.13
 """
 
+import atexit
 import csv
+import io
+import json
+import mmap
+import os
+import signal
+import sys
+import tempfile
+
+# Precomputed results for the short decimal strings that make up
+# nearly all license plate prefixes.
+_PREFIX_CACHE = {str(i): i for i in range(100)}
+
+def parse_prefix(text):
+    """
+    Convert a license plate prefix string to an integer.
+
+    Common one- and two-digit prefixes are resolved from a lookup
+    table; anything else falls back to int().
+
+    Args:
+        text (str): Prefix text to convert.
+
+    Returns:
+        int: The parsed prefix.
+
+    Raises:
+        ValueError: If the text is not a valid integer.
+    """
+    prefix = _PREFIX_CACHE.get(text)
+    if prefix is None:
+        prefix = int(text)
+
+    return prefix
+
+# Version of the cached data layout. Increase this whenever the
+# parsed data written to the cache changes shape or content, so
+# caches built by older versions of the program are ignored.
+_CACHE_VERSION = 4
+
+def _source_signature(filename):
+    """
+    Build a signature identifying the current version of a data file.
+
+    Args:
+        filename (str): Path to the source data file.
+
+    Returns:
+        tuple[int, int, int]:
+            The cache format version, followed by the file's
+            modification time (ns) and size.
+    """
+    stat = os.stat(filename)
+    return (_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+
+def _load_cache(filename, signature):
+    """
+    Load previously parsed data for a source file from its JSON cache.
+
+    The cache lives next to the source file (``<filename>.cache.json``).
+    Its first line holds the source signature it was built from, so a
+    stale cache is detected before the data itself is decoded. JSON is
+    used rather than pickle so a stray cache file can never execute
+    code when it is loaded.
+
+    Args:
+        filename (str): Path to the source data file.
+        signature (tuple): Current signature of the source file.
+
+    Returns:
+        object | None:
+            The cached data, or None if no valid cache exists.
+    """
+    try:
+        with open(filename + ".cache.json", encoding="utf-8") as cache:
+            if json.loads(cache.readline()) != list(signature):
+                return None
+
+            return json.loads(cache.read())
+
+    except (OSError, ValueError):
+        # Missing, unreadable, or corrupt caches are simply rebuilt.
+        return None
+
+def _write_cache(filename, signature, data):
+    """
+    Write parsed data for a source file to its JSON cache.
+
+    The cache is written to a temporary file and moved into place
+    so an interrupted write never leaves a partial cache behind.
+
+    Args:
+        filename (str): Path to the source data file.
+        signature (tuple): Signature of the source file, taken
+            before it was parsed.
+        data (object): Parsed data to store.
+    """
+    try:
+        directory = os.path.dirname(os.path.abspath(filename))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as cache:
+                cache.write(json.dumps(signature) + "\n")
+                cache.write(json.dumps(data))
+
+            os.replace(temp_path, filename + ".cache.json")
+
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    except OSError:
+        # Caching is an optimization; failing to write it is not fatal.
+        pass
 
 def load_county_data(filename):
     """
-    Load county data from a CSV file into a dictionary.
+    Load county data from a CSV file into a prefix-indexed list.
+
+    A lookup table of lowercase county seat names is built alongside
+    the county data and cached with it, so the seats do not need to
+    be recomputed on every run.
 
     The CSV file must contain the following columns:
         - License Plate Prefix
@@ -33,24 +153,85 @@ def load_county_data(filename):
         filename (str): Path to the CSV file containing county data.
 
     Returns:
-        dict[int, tuple[str, str]]:
-            A dictionary mapping license plate prefixes to a tuple
-            containing (county_name, county_seat).
+        tuple[list[tuple[str, str] | None], dict[str, int]]:
+            A list indexed by license plate prefix, where each entry
+            is a tuple containing (county_name, county_seat), or None
+            if no county uses that prefix; and a dictionary mapping
+            county seat names (lowercase) to license plate prefixes.
     """
-    counties = {}
+    # Take the signature before parsing so a file edited mid-parse
+    # is never cached under its newer signature.
+    signature = _source_signature(filename)
+
+    # Reuse the previously parsed data if the CSV has not changed.
+    cached = _load_cache(filename, signature)
+    if cached is not None:
+        counties, seats = cached
+
+        # JSON stores the county tuples as lists.
+        counties = [
+            None if county is None else tuple(county)
+            for county in counties
+        ]
+        return counties, seats
+
+    rows = {}
+
+    # Map the CSV file into memory and decode it straight from the
+    # page cache, bypassing the buffered text I/O layer. An empty
+    # file cannot be mapped, and has nothing to decode anyway.
+    text = ""
+    if signature[2]:
+        with open(filename, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                text = str(data, "utf-8")
+
+    # Read rows as plain lists. Feeding the csv module a stream keeps
+    # its own line handling, including newlines inside quoted fields.
+    reader = csv.reader(io.StringIO(text, newline=""))
+
+    # Resolve column positions once from the header row so each
+    # data row can be indexed directly instead of building a dict.
+    header = next(reader, None)
+    if header is None:
+        # An empty file has no counties.
+        return [], {}
+
+    prefix_index = header.index("License Plate Prefix")
+    county_index = header.index("County")
+    seat_index = header.index("County Seat")
+    min_length = max(prefix_index, county_index, seat_index) + 1
+
+    for row in reader:
+        # Skip blank and short rows, as csv.DictReader used to.
+        if len(row) < min_length:
+            continue
+
+        # Convert prefix to integer for faster lookup and validation.
+        prefix = parse_prefix(row[prefix_index])
+
+        # Negative prefixes cannot be used as list positions.
+        if prefix < 0:
+            continue
 
-    # Open CSV file and read rows as dictionaries.
-    with open(filename, newline="", encoding="utf-8") as file:
-        reader = csv.DictReader(file)
+        # Store county information as a tuple.
+        rows[prefix] = (row[county_index], row[seat_index])
 
-        for row in reader:
-            # Convert prefix to integer for faster lookup and validation.
-            prefix = int(row["License Plate Prefix"])
+    # Prefixes are small integers, so lay the counties out in a list
+    # indexed directly by prefix instead of hashing on every lookup.
+    counties = [None] * (max(rows, default=-1) + 1)
+    for prefix, county in rows.items():
+        counties[prefix] = county
 
-            # Store county information as a tuple.
-            counties[prefix] = (row["County"], row["County Seat"])
+    # Precompute the lowercase seat lookup so it can be cached too.
+    seats = {
+        sys.intern(seat.lower()): prefix
+        for prefix, (_, seat) in rows.items()
+    }
 
-    return counties
+    _write_cache(filename, signature, (counties, seats))
+
+    return counties, seats
 
 def load_city_data(filename):
     """
@@ -73,60 +254,172 @@ def load_city_data(filename):
     cities = {}
 
     try:
+        # Take the signature before parsing so a file edited mid-parse
+        # is never cached under its newer signature.
+        signature = _source_signature(filename)
+
+        # Reuse the previously parsed data if the file has not changed.
+        cached = _load_cache(filename, signature)
+        if cached is not None:
+            return cached
+
         with open(filename, "r", encoding="utf-8") as file:
-            for line in file:
-                # Remove whitespace and newline characters.
-                line = line.strip()
+            # Read the whole file at once and split it in memory rather
+            # than pulling it through the file object line by line.
+            # Universal newline mode has already turned "\r\n" and "\r"
+            # into "\n"; unlike splitlines(), splitting on "\n" alone
+            # leaves other line-break characters inside city names.
+            lines = [line for line in file.read().split("\n") if line]
 
-                # Skip empty lines to avoid parsing errors.
-                if not line:
-                    continue
+    except FileNotFoundError:
+        # File may not exist on first run; this is acceptable.
+        return cities
 
-                try:
-                    # Split line into city and prefix.
-                    city, prefix = line.split(",")
+    # The file is written as plain unquoted "city,prefix" lines, so
+    # disable quote handling; otherwise a city name starting with a
+    # quote would swallow every line after it.
+    reader = csv.reader(lines, quoting=csv.QUOTE_NONE)
 
-                    # Store using lowercase keys for consistency.
-                    cities[city.lower()] = int(prefix)
+    for row in reader:
+        # Skip empty and malformed lines; each entry must
+        # contain exactly a city and a prefix.
+        if len(row) != 2:
+            continue
 
-                except ValueError:
-                    # Ignore malformed lines instead of crashing.
-                    continue
+        try:
+            # Store using interned lowercase keys for consistency.
+            # Interning also shares each name with the county seat
+            # keys, which are interned the same way when parsed.
+            cities[sys.intern(row[0].lower())] = parse_prefix(row[1])
 
-    except FileNotFoundError:
-        # File may not exist on first run; this is acceptable.
-        pass
+        except ValueError:
+            # Ignore non-numeric prefixes instead of crashing.
+            continue
+
+    _write_cache(filename, signature, cities)
 
     return cities
 
-def populate_county_seats(cities, counties):
+def get_county(counties, prefix):
+    """
+    Find the county data for a license plate prefix.
+
+    Args:
+        counties (list): Prefix-indexed county data.
+        prefix (int): License plate prefix to look up.
+
+    Returns:
+        tuple[str, str] | None:
+            The (county_name, county_seat) tuple, or None if
+            no county uses that prefix.
+    """
+    if 0 <= prefix < len(counties):
+        return counties[prefix]
+
+    return None
+
+def populate_county_seats(cities, seats):
     """
     Add county seats to the city lookup dictionary.
 
     This allows county seats from the CSV file to be recognized
     automatically as valid city inputs without requiring them
     to be stored in the persistent city file.
-    """
-    for prefix, (_, seat) in counties.items():
-        seat_lower = seat.lower()
 
-        # Do not overwrite user-added entries.
-        if seat_lower not in cities:
-            cities[seat_lower] = prefix
+    Args:
+        cities (dict): City-to-prefix mapping.
+        seats (dict): County seat (lowercase) to prefix mapping.
+    """
+    # setdefault probes each key once and does not overwrite
+    # user-added entries.
+    for seat_lower, prefix in seats.items():
+        cities.setdefault(seat_lower, prefix)
 
-def add_city_to_store(filename, city, prefix):
+class CityStore:
+    """
+    Persistent append-only store for user-added city mappings.
+
+    New entries are collected in memory and written to the data file
+    in a single write once enough have accumulated, when the user
+    leaves city lookup, or when the store is closed at exit. The file
+    is opened on the first flush as a raw append-only descriptor and
+    kept open, so each flush is one system call with no text I/O
+    layer in between.
     """
-    Append a new city and prefix mapping to the data file.
 
-    This allows newly added cities to persist between program runs.
+    # Number of pending bytes that triggers an early flush.
+    FLUSH_THRESHOLD = 4096
 
-    Args:
-        filename (str): Path to the city data file.
-        city (str): Name of the city.
-        prefix (int): Associated license plate prefix.
-    """
-    with open(filename, "a", encoding="utf-8") as file:
-        file.write(f"{city},{prefix}\n")
+    def __init__(self, filename):
+        """
+        Prepare to append to the city data file.
+
+        The file is not opened (or created) until there is an entry
+        to write.
+
+        Args:
+            filename (str): Path to the city data file.
+        """
+        self._filename = filename
+        self._fd = None
+        self._pending = bytearray()
+        atexit.register(self.close)
+
+    def add(self, city, prefix):
+        """
+        Queue a new city and prefix mapping for the data file.
+
+        This allows newly added cities to persist between program runs.
+
+        Args:
+            city (str): Name of the city.
+            prefix (int): Associated license plate prefix.
+        """
+        self._pending += f"{city},{prefix}\n".encode("utf-8")
+
+        if len(self._pending) >= self.FLUSH_THRESHOLD:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all pending entries to the data file.
+        """
+        if not self._pending:
+            return
+
+        # Open the file on first use so it is only created once a
+        # city has actually been added.
+        if self._fd is None:
+            self._fd = os.open(
+                self._filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+            )
+
+        # os.write may write fewer bytes than requested. Every view is
+        # released as soon as it is used so the buffer stays resizable
+        # even if a write fails.
+        offset = 0
+        with memoryview(self._pending) as data:
+            while offset < len(data):
+                with data[offset:] as chunk:
+                    offset += os.write(self._fd, chunk)
+
+        # Start over with a fresh buffer so its memory is released.
+        self._pending = bytearray()
+
+    def close(self):
+        """
+        Flush pending entries and close the data file.
+
+        The file is closed even if the final write fails; the error
+        is still raised so lost entries are not silent.
+        """
+        try:
+            self.flush()
+
+        finally:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
 
 def license_lookup(counties):
     """
@@ -136,7 +429,7 @@ def license_lookup(counties):
     the associated county and county seat if found.
 
     Args:
-        counties (dict): Mapping of prefixes to county data.
+        counties (list): Prefix-indexed county data.
     """
 
     # Loop allows user to retry without returning to main menu.
@@ -149,20 +442,22 @@ def license_lookup(counties):
             return
 
         try:
-            prefix = int(user_input)
+            prefix = parse_prefix(user_input)
         except ValueError:
             print("Please enter a valid number.")
             continue
 
         # Check whether the prefix exists in the dataset.
-        if prefix in counties:
-            county, seat = counties[prefix]
-            print(f"County: {county}")
-            print(f"County Seat: {seat}")
-        else:
+        entry = get_county(counties, prefix)
+        if entry is None:
             print("Unknown license plate prefix.")
+            continue
 
-def city_lookup(cities, counties, city_file):
+        county, seat = entry
+        print(f"County: {county}")
+        print(f"County Seat: {seat}")
+
+def city_lookup(cities, counties, store):
     """
     Perform a lookup using a city name.
 
@@ -172,28 +467,34 @@ def city_lookup(cities, counties, city_file):
 
     Args:
         cities (dict): City-to-prefix mapping.
-        counties (dict): Prefix-to-county mapping.
-        city_file (str): Path to persistent city storage file.
+        counties (list): Prefix-indexed county data.
+        store (CityStore): Persistent city storage.
     """
 
     # Loop allows user to retry without returning to main menu.
     while True:
-        city = input(
+        # Intern the normalized name so repeat queries can match
+        # dictionary keys by identity.
+        city = sys.intern(input(
             "\nEnter city name (or 'q' to return): "
-        ).lower()
+        ).strip().lower())
 
         # Prevent empty input.
         if city == "q":
+            # Persist any cities added during this lookup session.
+            store.flush()
             return
 
         if not city:
             print("City name cannot be empty.")
             continue
 
-        # Existing city lookup.
-        if city in cities:
-            prefix = cities[city]
-            county, _ = counties[prefix]
+        # Existing city lookup; entries whose prefix has no county
+        # are treated as unknown.
+        prefix = cities.get(city)
+        entry = None if prefix is None else get_county(counties, prefix)
+        if entry is not None:
+            county, _ = entry
             print(f"County: {county}")
             print(f"License Prefix: {prefix}")
             continue
@@ -202,7 +503,7 @@ def city_lookup(cities, counties, city_file):
 
         # Allow user to add new mapping.
         try:
-            prefix = int(
+            prefix = parse_prefix(
                 input("Enter license prefix for this city (or -1 to cancel): ")
             )
         except ValueError:
@@ -213,28 +514,115 @@ def city_lookup(cities, counties, city_file):
             continue
 
         # Validate that prefix exists in county data.
-        if prefix not in counties:
+        if get_county(counties, prefix) is None:
             print("That license prefix does not exist.")
             continue
 
         # Persist new entry and update in-memory dictionary.
-        add_city_to_store(city_file, city, prefix)
+        store.add(city, prefix)
         cities[city] = prefix
 
         print("City added for future lookups.")
 
+def run_batch(counties, cities):
+    """
+    Perform lookups read from non-interactive standard input.
+
+    Each input line holds a menu choice followed by its argument:
+        1 prefix
+        2 city_name
+
+    No menus or prompts are printed, and unknown cities are
+    reported rather than added. Output is collected in the
+    buffered standard output stream and flushed once at the end.
+
+    Args:
+        counties (list): Prefix-indexed county data.
+        cities (dict): City-to-prefix mapping.
+    """
+    out = sys.stdout.buffer
+
+    for line in sys.stdin:
+        # Split into the choice and the rest of the line so
+        # city names may contain spaces.
+        parts = line.split(maxsplit=1)
+
+        # Skip blank lines.
+        if not parts:
+            continue
+
+        choice = parts[0]
+        argument = parts[1].strip() if len(parts) > 1 else ""
+
+        if choice == "1":
+            try:
+                prefix = parse_prefix(argument)
+            except ValueError:
+                result = "Please enter a valid number.\n"
+            else:
+                entry = get_county(counties, prefix)
+                if entry is None:
+                    result = "Unknown license plate prefix.\n"
+                else:
+                    county, seat = entry
+                    result = f"County: {county}\nCounty Seat: {seat}\n"
+
+        elif choice == "2":
+            prefix = cities.get(argument.lower())
+            entry = None if prefix is None else get_county(counties, prefix)
+            if entry is None:
+                result = "City not found.\n"
+            else:
+                county, _ = entry
+                result = f"County: {county}\nLicense Prefix: {prefix}\n"
+
+        else:
+            result = "Invalid choice.\n"
+
+        out.write(result.encode("utf-8"))
+
+    out.flush()
+
+def _exit_on_signal(signum, frame):
+    """
+    Turn a termination signal into a normal interpreter exit.
+
+    Raising SystemExit lets exit handlers run, so cities added
+    but not yet written are saved when the terminal is closed
+    or the program is terminated.
+
+    Args:
+        signum (int): Number of the received signal.
+        frame (frame): Current stack frame (unused).
+    """
+    raise SystemExit(128 + signum)
+
 def main():
     """
     Main program loop.
 
     Loads required data files and repeatedly prompts the
-    user for an action until the user chooses to quit.
+    user for an action until the user chooses to quit. When
+    input is piped or redirected, lookups are run in batch
+    mode instead.
     """
-    counties = load_county_data("MontanaCounties.csv")
+    counties, seats = load_county_data("MontanaCounties.csv")
     cities = load_city_data("cities.txt")
 
     # Automatically add county seats as valid city entries.
-    populate_county_seats(cities, counties)
+    populate_county_seats(cities, seats)
+
+    # Skip the interactive menus when input is not a terminal.
+    if not sys.stdin.isatty():
+        return run_batch(counties, cities)
+
+    store = CityStore("cities.txt")
+
+    # Closing the terminal sends SIGHUP, which is not available on
+    # every platform; exit cleanly on it and on SIGTERM.
+    for name in ("SIGHUP", "SIGTERM"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), _exit_on_signal)
 
     while True:
         print("\nSelect an option:")
@@ -248,7 +636,7 @@ def main():
             license_lookup(counties)
 
         elif choice == "2":
-            city_lookup(cities, counties, "cities.txt")
+            city_lookup(cities, counties, store)
 
         elif choice == "3":
             print("Thanks for playing. Goodbye!")